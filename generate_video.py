@@ -7,8 +7,15 @@ illustration, flat color areas, strong warm/cool contrast, visible
 brushstroke textures, silhouette-heavy compositions.
 """
 
+import asyncio
+import functools
+import hashlib
+import json
+import mmap
 import os
+import shutil
 import sys
+import tempfile
 import time
 import subprocess
 import platform
@@ -22,10 +29,29 @@ except ImportError:
     print("Install with: pip install google-genai")
     sys.exit(1)
 
+try:
+    from dotenv import dotenv_values
+except ImportError:
+    dotenv_values = None  # fall back to manual .env parsing
+
 # Configuration
 OUTPUT_DIR = Path(__file__).parent / "output"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Content-addressed cache of generated assets, keyed by model + prompt +
+# config. Lets prompt-tweaking runs reuse every scene that didn't change.
+CACHE_DIR = OUTPUT_DIR / "cache"
+CACHE_DIR.mkdir(exist_ok=True)
+CACHE_VERSION = "v1"  # bump to invalidate all cached assets
+
+# How many scenes may be in flight at once (API quota bound, not CPU bound)
+MAX_CONCURRENT_SCENES = 4
+
+# Concurrent Ken Burns encodes; libx264 already uses ~4 threads per job,
+# so cap the pool well below the core count to avoid oversubscription
+ENCODE_POOL_SIZE = max(1, (os.cpu_count() or 4) // 4)
+ENCODE_THREADS = 4  # threads per ffmpeg job, keeps scheduling deterministic
+
 # Enhanced artistic style prompt for human-like painting look
 VAN_GOGH_STYLE = """Traditional oil painting in Van Gogh post-impressionist style.
 Thick impasto brushstrokes with visible paint texture and canvas grain. Hand-painted aesthetic with organic imperfections.
@@ -41,51 +67,132 @@ SCENES = [
         "text": "You are growing in ways\nyour eyes can't see yet.",
         "objective": "Painterly mirror scene as she ties her hair.",
         "camera": "slow zoom-in",
-        "prompt": f"""A young woman with long dark hair tying her hair in front of an ornate vintage mirror in a warmly lit bedroom.
+        "prompt": f"""{VAN_GOGH_STYLE}
+
+A young woman with long dark hair tying her hair in front of an ornate vintage mirror in a warmly lit bedroom.
 Morning golden sunlight streaming through curtains creating dramatic rays. Her silhouette reflected in mirror.
-Warm amber and ochre tones contrasting with deep blue shadows. Visible brushstroke textures on walls and fabrics.
-{VAN_GOGH_STYLE}"""
+Warm amber and ochre tones contrasting with deep blue shadows. Visible brushstroke textures on walls and fabrics."""
     },
     {
         "id": 2,
         "text": "Grace writes the parts of you\ndiscipline never could.",
         "objective": "Painterly café window shot with her writing gently.",
         "camera": "slow outside-in drift",
-        "prompt": f"""View through a rain-streaked café window at night. A young woman sits inside writing in a journal,
+        "prompt": f"""{VAN_GOGH_STYLE}
+
+View through a rain-streaked café window at night. A young woman sits inside writing in a journal,
 illuminated by warm interior lamplight. Steam rising from coffee cup. Cool blue night outside contrasts with warm amber interior.
-Wet cobblestone street reflects lights. Bold brushstroke textures on glass and reflections.
-{VAN_GOGH_STYLE}"""
+Wet cobblestone street reflects lights. Bold brushstroke textures on glass and reflections."""
     },
     {
         "id": 3,
         "text": "Every quiet yes becomes a doorway\nto who you're becoming.",
         "objective": "Painterly golden street walk, silhouette soft.",
         "camera": "slow follow",
-        "prompt": f"""A young woman walking alone on a tree-lined European street at golden hour sunset.
+        "prompt": f"""{VAN_GOGH_STYLE}
+
+A young woman walking alone on a tree-lined European street at golden hour sunset.
 Her silhouette backlit by intense orange sun creating long dramatic shadows on cobblestones.
 Autumn trees with swirling Van Gogh-style leaves in amber and gold. Deep blue sky above.
-Mediterranean architecture with warm stone buildings. Bold impasto brushwork throughout.
-{VAN_GOGH_STYLE}"""
+Mediterranean architecture with warm stone buildings. Bold impasto brushwork throughout."""
     },
     {
         "id": 4,
         "text": "You are not behind —\nyour bloom is simply deliberate.",
         "objective": "Painterly mountain sunrise.",
         "camera": "upward tilt",
-        "prompt": f"""Majestic mountain landscape at sunrise with dramatic clouds. Snow-capped peaks catching first golden light.
+        "prompt": f"""{VAN_GOGH_STYLE}
+
+Majestic mountain landscape at sunrise with dramatic clouds. Snow-capped peaks catching first golden light.
 Layers of mountains in atmospheric perspective. Swirling Van Gogh sky with bold brushstrokes in orange, pink, and deep blue.
-Pine tree silhouettes in foreground. Mist in valleys. Expansive vista with emotional intensity.
-{VAN_GOGH_STYLE}"""
+Pine tree silhouettes in foreground. Mist in valleys. Expansive vista with emotional intensity."""
     }
 ]
 
+
+def _detect_hw_encoder():
+    """Return encoder args for a hardware H.264 encoder, or None if CPU-only."""
+    if sys.platform == 'darwin':
+        # VideoToolbox offloads to the media engine; -allow_sw keeps older
+        # Macs working if the hardware session can't be created
+        return ['-c:v', 'h264_videotoolbox', '-b:v', '6M', '-allow_sw', '1']
+    if sys.platform.startswith('linux'):
+        try:
+            probe = subprocess.run(
+                ['ffmpeg', '-hide_banner', '-encoders'],
+                capture_output=True, text=True
+            )
+            if 'h264_nvenc' in probe.stdout:
+                return ['-c:v', 'h264_nvenc', '-preset', 'p4']
+        except OSError:
+            pass
+    return None
+
+
+_HW_ENCODER_ARGS = _detect_hw_encoder()
+
+# Encoder for the Ken Burns renders and the final assembly pass; the
+# hardware encoder is used for both when available.
+VIDEO_ENCODER_ARGS = _HW_ENCODER_ARGS or ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20']
+
+# Canonical stream parameters for every encode. Final assembly re-encodes
+# through a filter_complex concat, which guarantees a uniform output on
+# its own; pinning fps/pixfmt/timebase on the per-scene encodes keeps the
+# segments feeding that pass (and any cached ones from older runs) alike.
+NORMALIZE_ARGS = ['-r', '25', '-pix_fmt', 'yuv420p', '-video_track_timescale', '12800']
+
 # Text overlay settings matching reference video
 FONT_SIZE = 42  # Larger for better readability
 TEXT_COLOR = "white"
 TEXT_SHADOW_COLOR = "black@0.8"  # Stronger shadow
 TEXT_Y_PERCENT = 0.25  # ~25% from top like reference
+TEXT_Y_EXPR = f"h*{TEXT_Y_PERCENT}"
+
+
+def _find_font_file():
+    """Pick a serif font for drawtext - try multiple cross-platform options."""
+    system = platform.system().lower()
+
+    # Platform-specific font paths
+    if system == "windows":
+        font_options = [
+            "C:\\Windows\\Fonts\\times.ttf",
+            "C:\\Windows\\Fonts\\timesbd.ttf",
+            "C:\\Windows\\Fonts\\arial.ttf",  # fallback
+        ]
+    elif system == "linux":
+        font_options = [
+            "/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf",
+            "/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf",
+            "/usr/share/fonts/truetype/freefont/FreeSerif.ttf",
+            "/usr/share/fonts/TTF/DejaVuSerif.ttf",  # alternative path
+        ]
+    elif system == "darwin":  # macOS
+        font_options = [
+            "/System/Library/Fonts/Supplemental/Times New Roman.ttf",
+            "/System/Library/Fonts/Times.ttc",
+            "/System/Library/Fonts/NewYork.ttf",
+            "/Library/Fonts/Times New Roman.ttf",  # alternative path
+        ]
+    else:
+        # Fallback for other systems
+        font_options = []
+
+    # Add common FFmpeg font names as fallback
+    font_options.extend([
+        "Times-Roman",  # Common FFmpeg font name
+        "Times",        # Generic fallback
+        "serif",        # Generic serif fallback
+    ])
+
+    return next((f for f in font_options if Path(f).exists()), "Times")
 
 
+# Resolved once at import; fonts don't change mid-run
+FONT_FILE = _find_font_file()
+
+
+@functools.lru_cache(maxsize=None)
 def find_api_key():
     """Find Gemini API key from environment or .env files."""
     api_key = os.getenv('GEMINI_API_KEY')
@@ -100,7 +207,14 @@ def find_api_key():
     ]
 
     for env_path in env_paths:
-        if env_path.exists():
+        if not env_path.exists():
+            continue
+        if dotenv_values is not None:
+            # dotenv handles quoting and 'export KEY=...' syntax correctly
+            value = dotenv_values(env_path).get('GEMINI_API_KEY')
+            if value:
+                return value
+        else:
             with open(env_path) as f:
                 for line in f:
                     if line.startswith('GEMINI_API_KEY='):
@@ -108,13 +222,132 @@ def find_api_key():
     return None
 
 
-def generate_image(client, prompt: str, output_path: Path, max_retries: int = 5) -> bool:
+class TokenBucket:
+    """Paces API calls against a requests-per-minute quota up front,
+    instead of burning a request to discover a 429.
+
+    On a 429 the caller reports back via throttle(), which halves the
+    effective refill rate for the next 60s (the increase half of AIMD
+    happens naturally when the penalty window expires).
+    """
+
+    def __init__(self, rpm: float, burst: int):
+        self.rate = rpm / 60.0  # tokens per second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.penalty_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _effective_rate(self, now: float) -> float:
+        return self.rate / 2 if now < self.penalty_until else self.rate
+
+    async def acquire(self):
+        """Block until a request token is available."""
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst,
+                    self.tokens + (now - self.updated) * self._effective_rate(now)
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self._effective_rate(now)
+            await asyncio.sleep(wait)
+
+    def throttle(self):
+        """Halve the refill rate for 60s; call when the API returns 429."""
+        self.penalty_until = time.monotonic() + 60
+
+
+# Pace requests to the published per-model quotas; Veo is far tighter
+# than Imagen. Burst equals the scene count so a warm start isn't delayed.
+IMAGEN_BUCKET = TokenBucket(rpm=10, burst=len(SCENES))
+VEO_BUCKET = TokenBucket(rpm=2, burst=2)
+
+
+def cache_key(model: str, prompt: str, config: dict) -> str:
+    """Content-address a generation request: same inputs -> same key."""
+    payload = json.dumps(
+        {'version': CACHE_VERSION, 'model': model, 'prompt': prompt, 'config': config},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def file_fingerprint(path: Path) -> str:
+    """Hash a file's bytes without copying them into the Python heap.
+
+    hashlib.file_digest (3.11+) streams through a small reusable buffer;
+    older interpreters hash an mmap'd view instead. Either way the asset
+    never materializes as a Python bytes object.
+    """
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+
+def cache_fetch(key: str, suffix: str, output_path: Path) -> bool:
+    """Copy a cached artifact to output_path if present. Returns True on hit."""
+    cached = CACHE_DIR / f"{key}{suffix}"
+    if not cached.exists():
+        return False
+    shutil.copy(cached, output_path)
+    return True
+
+
+def cache_store(key: str, suffix: str, artifact: Path, model: str, prompt: str):
+    """Copy a freshly generated artifact into the cache with a metadata sidecar."""
+    cached = CACHE_DIR / f"{key}{suffix}"
+    shutil.copy(artifact, cached)
+    sidecar = CACHE_DIR / f"{key}.json"
+    sidecar.write_text(json.dumps({
+        'model': model,
+        'prompt': prompt,
+        'created': time.time(),
+    }, indent=2))
+
+
+async def run_ffmpeg(cmd: list, capture_stdout: bool = False) -> tuple:
+    """Run an ffmpeg/ffprobe command without blocking the event loop.
+
+    Returns (returncode, stdout, stderr) with the outputs decoded. stdout
+    goes to /dev/null unless capture_stdout is set (only ffprobe queries
+    need it); stderr stays piped for error reporting but the encode
+    commands pass -loglevel error so it is near-empty on success.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE if capture_stdout else asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    return (proc.returncode,
+            stdout.decode(errors='replace') if stdout else '',
+            stderr.decode(errors='replace'))
+
+
+async def generate_image(client, prompt: str, output_path: Path, max_retries: int = 5) -> bool:
     """Generate image using Imagen 4."""
+    image_config = {'numberOfImages': 1, 'aspectRatio': '9:16', 'imageSize': '1K'}
+    key = cache_key('imagen-4.0-generate-001', prompt, image_config)
+    if cache_fetch(key, '.png', output_path):
+        print(f"  Cache hit: {output_path.name}")
+        return True
+
     for attempt in range(max_retries):
         try:
+            await IMAGEN_BUCKET.acquire()
             print(f"  Generating image (attempt {attempt + 1}/{max_retries})...")
 
-            response = client.models.generate_images(
+            # genai SDK is synchronous; run the blocking call in a thread
+            response = await asyncio.to_thread(
+                client.models.generate_images,
                 model='imagen-4.0-generate-001',
                 prompt=prompt,
                 config=types.GenerateImagesConfig(
@@ -125,46 +358,84 @@ def generate_image(client, prompt: str, output_path: Path, max_retries: int = 5)
             )
 
             for generated_image in response.generated_images:
-                with open(output_path, 'wb') as f:
+                # Write to a sibling temp file and publish atomically, so a
+                # crash mid-write never leaves a truncated PNG behind that a
+                # later run would mistake for a finished asset.
+                tmp_path = output_path.with_name(output_path.name + '.tmp')
+                with open(tmp_path, 'wb') as f:
                     f.write(generated_image.image.image_bytes)
+                os.replace(tmp_path, output_path)
+                cache_store(key, '.png', output_path, 'imagen-4.0-generate-001', prompt)
                 print(f"  Saved: {output_path}")
                 return True
 
         except Exception as e:
             error_str = str(e)
             if '429' in error_str or 'RESOURCE_EXHAUSTED' in error_str:
+                IMAGEN_BUCKET.throttle()
                 wait_time = min(2 ** attempt * 10, 120)
                 print(f"  Rate limited. Waiting {wait_time}s...")
-                time.sleep(wait_time)
+                await asyncio.sleep(wait_time)
             elif '503' in error_str or 'UNAVAILABLE' in error_str:
                 wait_time = min(2 ** attempt * 5, 60)
                 print(f"  Service unavailable. Waiting {wait_time}s...")
-                time.sleep(wait_time)
+                await asyncio.sleep(wait_time)
             else:
                 print(f"  Error: {error_str}")
                 if attempt == max_retries - 1:
                     return False
-                time.sleep(5)
+                await asyncio.sleep(5)
     return False
 
 
-def generate_video_from_image(client, image_path: Path, prompt: str, output_path: Path,
-                               max_retries: int = 3) -> bool:
-    """Generate animated video from image using Veo (image-to-video)."""
+async def generate_video_from_image(client, image_path: Path, prompt: str, output_path: Path,
+                                    veo_state: dict, max_retries: int = 3) -> bool:
+    """Generate animated video from image using Veo (image-to-video).
+
+    Checks veo_state['use_veo'] before every attempt, so once any scene
+    declares Veo down the others stop burning quota and backoff time on
+    their own remaining retries.
+    """
+    # Fingerprint the reference image into the cache key, so a hand-edited
+    # or regenerated source PNG busts the cached animation for that scene.
+    # Read it once up front too; a missing or unreadable PNG fails just
+    # this scene like every other error here, instead of escaping the task.
+    try:
+        image_sha256 = file_fingerprint(image_path)
+        image_bytes = image_path.read_bytes()
+    except OSError as e:
+        print(f"  Error reading reference image: {e}")
+        return False
+
+    video_config = {
+        'aspect_ratio': '9:16',
+        'resolution': '720p',
+        'image_sha256': image_sha256,
+    }
+    key = cache_key('veo-3.1-generate-preview', prompt, video_config)
+    if cache_fetch(key, '.mp4', output_path):
+        print(f"  Cache hit: {output_path.name}")
+        return True
+
+    # Reuse the same types.Image across retries; the Veo predict endpoint
+    # takes inline bytes, not Files-API handles, so this is as close to
+    # upload-once as the API allows
+    reference_image = types.Image(
+        image_bytes=image_bytes,
+        mime_type='image/png'
+    )
+
     for attempt in range(max_retries):
+        if not veo_state['use_veo']:
+            # Another scene already found Veo down while we were queued
+            # or backing off; go straight to the Ken Burns fallback
+            print("  Veo disabled by another scene, skipping remaining attempts")
+            return False
         try:
+            await VEO_BUCKET.acquire()
             print(f"  Generating video animation (attempt {attempt + 1}/{max_retries})...")
             print(f"  This may take 1-3 minutes...")
 
-            # Load the image
-            image_bytes = image_path.read_bytes()
-
-            # Create image object for Veo
-            reference_image = types.Image(
-                image_bytes=image_bytes,
-                mime_type='image/png'
-            )
-
             # Generate video config
             config = types.GenerateVideosConfig(
                 aspect_ratio='9:16',
@@ -174,30 +445,40 @@ def generate_video_from_image(client, image_path: Path, prompt: str, output_path
             start_time = time.time()
 
             # Generate video from image using Veo 3.1 for better quality
-            operation = client.models.generate_videos(
+            operation = await asyncio.to_thread(
+                client.models.generate_videos,
                 model='veo-3.1-generate-preview',
                 prompt=prompt,
                 image=reference_image,
                 config=config
             )
 
-            # Poll until complete
+            # Poll until complete; other scenes keep running while we sleep.
+            # Back off adaptively: Veo rarely finishes in under a minute, so
+            # start with short delays and grow towards a 30s cap to roughly
+            # halve the number of status round-trips over a 1-3 minute wait.
             poll_count = 0
             while not operation.done:
                 poll_count += 1
-                if poll_count % 6 == 0:  # Update every 60s
-                    elapsed = time.time() - start_time
+                delay = min(5 * poll_count, 30)
+                elapsed = time.time() - start_time
+                if elapsed >= 60 and poll_count % 3 == 0:
                     print(f"    Still generating... ({elapsed:.0f}s)")
-                time.sleep(10)
-                operation = client.operations.get(operation)
+                await asyncio.sleep(delay)
+                operation = await asyncio.to_thread(client.operations.get, operation)
 
             duration = time.time() - start_time
             print(f"  Generated in {duration:.0f}s")
 
             # Get the video
             generated_video = operation.response.generated_videos[0]
-            client.files.download(file=generated_video.video)
-            generated_video.video.save(str(output_path))
+            await asyncio.to_thread(client.files.download, file=generated_video.video)
+            # Save to a temp name then rename, so partially written videos
+            # never shadow the real output path.
+            tmp_path = output_path.with_name(output_path.name + '.tmp')
+            generated_video.video.save(str(tmp_path))
+            os.replace(tmp_path, output_path)
+            cache_store(key, '.mp4', output_path, 'veo-3.1-generate-preview', prompt)
 
             print(f"  Saved: {output_path}")
             return True
@@ -206,73 +487,35 @@ def generate_video_from_image(client, image_path: Path, prompt: str, output_path
             error_str = str(e)
             print(f"  Error: {error_str}")
             if '429' in error_str or 'RESOURCE_EXHAUSTED' in error_str:
+                VEO_BUCKET.throttle()
                 wait_time = min(2 ** attempt * 30, 180)
                 print(f"  Rate limited. Waiting {wait_time}s...")
-                time.sleep(wait_time)
+                await asyncio.sleep(wait_time)
             elif attempt == max_retries - 1:
                 return False
             else:
-                time.sleep(10)
+                await asyncio.sleep(10)
     return False
 
 
-def add_text_overlay_to_video(input_video: Path, output_video: Path, text: str) -> bool:
-    """Add text overlay to video matching reference style. Also strips audio."""
-    # Escape special characters for ffmpeg drawtext
-    escaped_text = text.replace("\\", "\\\\").replace("'", "'\\''").replace(":", "\\:").replace("%", "\\%")
+def build_drawtext_filter(text: str) -> tuple:
+    """Build the drawtext filter string used for scene text overlays.
 
-    # Use a clean serif font - try multiple cross-platform options
-    system = platform.system().lower()
-
-    # Platform-specific font paths
-    if system == "windows":
-        font_options = [
-            "C:\\Windows\\Fonts\\times.ttf",
-            "C:\\Windows\\Fonts\\timesbd.ttf",
-            "C:\\Windows\\Fonts\\arial.ttf",  # fallback
-        ]
-    elif system == "linux":
-        font_options = [
-            "/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf",
-            "/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf",
-            "/usr/share/fonts/truetype/freefont/FreeSerif.ttf",
-            "/usr/share/fonts/TTF/DejaVuSerif.ttf",  # alternative path
-        ]
-    elif system == "darwin":  # macOS
-        font_options = [
-            "/System/Library/Fonts/Supplemental/Times New Roman.ttf",
-            "/System/Library/Fonts/Times.ttc",
-            "/System/Library/Fonts/NewYork.ttf",
-            "/Library/Fonts/Times New Roman.ttf",  # alternative path
-        ]
-    else:
-        # Fallback for other systems
-        font_options = []
-
-    # Add common FFmpeg font names as fallback
-    font_options.extend([
-        "Times-Roman",  # Common FFmpeg font name
-        "Times",        # Generic fallback
-        "serif",        # Generic serif fallback
-    ])
-
-    font_file = None
-    for font in font_options:
-        if Path(font).exists():
-            font_file = font
-            break
-
-    if not font_file:
-        font_file = "Times"
-
-    # Calculate Y position
-    y_expr = f"h*{TEXT_Y_PERCENT}"
+    The text goes through drawtext's textfile= option instead of inline
+    escaping, so arbitrary unicode and ffmpeg metacharacters are safe.
+    Returns (filter_string, textfile_path); the caller must unlink the
+    textfile once ffmpeg has finished.
+    """
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False,
+                                     encoding='utf-8') as tf:
+        tf.write(text)
+        textfile = Path(tf.name)
 
     # Build drawtext filter with strong shadow for visibility
     # Using borderw for outline effect + shadow for better contrast
     drawtext_filter = (
-        f"drawtext=fontfile='{font_file}':"
-        f"text='{escaped_text}':"
+        f"drawtext=fontfile='{FONT_FILE}':"
+        f"textfile='{textfile}':"
         f"fontsize={FONT_SIZE}:"
         f"fontcolor=white:"
         f"borderw=2:"
@@ -280,129 +523,225 @@ def add_text_overlay_to_video(input_video: Path, output_video: Path, text: str)
         f"shadowcolor=black@0.9:"
         f"shadowx=3:shadowy=3:"
         f"x=(w-text_w)/2:"
-        f"y={y_expr}:"
+        f"y={TEXT_Y_EXPR}:"
         f"line_spacing=12"
     )
+    return drawtext_filter, textfile
 
-    # Strip audio (-an) and apply text overlay
-    cmd = [
-        'ffmpeg', '-y',
-        '-i', str(input_video),
-        '-vf', drawtext_filter,
-        '-c:v', 'libx264',
-        '-an',  # Remove audio completely
-        '-preset', 'medium',
-        str(output_video)
-    ]
 
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"  FFmpeg error: {result.stderr}")
-            return False
-        return True
-    except Exception as e:
-        print(f"  Error adding text: {e}")
-        return False
+async def probe_dimensions(video_path: Path) -> tuple:
+    """Return (width, height) of a video's first stream, or (None, None)."""
+    returncode, stdout, _ = await run_ffmpeg([
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'stream=width,height', '-of', 'csv=p=0',
+        str(video_path)
+    ], capture_stdout=True)
+    if returncode == 0 and stdout.strip():
+        try:
+            width, height = (int(v) for v in stdout.strip().split(',')[:2])
+            return width, height
+        except ValueError:
+            pass
+    return None, None
+
 
+async def create_fallback_video(image_path: Path, output_video: Path, duration: float = 6.0,
+                                motion: str = "zoom-in", text: str = None) -> bool:
+    """Create video from image with Ken Burns effect as fallback.
 
-def create_fallback_video(image_path: Path, output_video: Path, duration: float = 6.0,
-                          motion: str = "zoom-in") -> bool:
-    """Create video from image with Ken Burns effect as fallback."""
+    When text is given the overlay is fused into the same encode, so the
+    scene needs no second drawtext pass afterwards.
+    """
 
     if motion == "slow zoom-in":
-        filter_complex = (
-            f"[0:v]scale=8000:-1,zoompan=z='min(zoom+0.0003,1.12)':"
+        motion_chain = (
+            f"[0:v]scale=-2:2560,zoompan=z='min(zoom+0.0003,1.12)':"
             f"d={int(duration*25)}:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':"
-            f"s=720x1280,setsar=1[v]"
+            f"s=720x1280,setsar=1"
         )
     elif motion == "slow outside-in drift":
-        filter_complex = (
-            f"[0:v]scale=8000:-1,zoompan=z='min(zoom+0.0002,1.1)':"
+        motion_chain = (
+            f"[0:v]scale=-2:2560,zoompan=z='min(zoom+0.0002,1.1)':"
             f"d={int(duration*25)}:x='if(eq(on,1),iw/4,x-0.3)':y='ih/2-(ih/zoom/2)':"
-            f"s=720x1280,setsar=1[v]"
+            f"s=720x1280,setsar=1"
         )
     elif motion == "slow follow":
-        filter_complex = (
-            f"[0:v]scale=8000:-1,zoompan=z='1.08':"
+        motion_chain = (
+            f"[0:v]scale=-2:2560,zoompan=z='1.08':"
             f"d={int(duration*25)}:x='if(eq(on,1),0,x+0.8)':y='ih/2-(ih/zoom/2)':"
-            f"s=720x1280,setsar=1[v]"
+            f"s=720x1280,setsar=1"
         )
     elif motion == "upward tilt":
-        filter_complex = (
-            f"[0:v]scale=8000:-1,zoompan=z='1.1':"
+        motion_chain = (
+            f"[0:v]scale=-2:3200,zoompan=z='1.1':"
             f"d={int(duration*25)}:x='iw/2-(iw/zoom/2)':y='if(eq(on,1),ih/3,y-0.6)':"
-            f"s=720x1280,setsar=1[v]"
+            f"s=720x1280,setsar=1"
         )
     else:
-        filter_complex = (
-            f"[0:v]scale=8000:-1,zoompan=z='min(zoom+0.0003,1.1)':"
+        motion_chain = (
+            f"[0:v]scale=-2:2560,zoompan=z='min(zoom+0.0003,1.1)':"
             f"d={int(duration*25)}:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':"
-            f"s=720x1280,setsar=1[v]"
+            f"s=720x1280,setsar=1"
         )
 
+    textfile = None
+    if text:
+        drawtext_filter, textfile = build_drawtext_filter(text)
+        filter_complex = f"{motion_chain},{drawtext_filter}[v]"
+    else:
+        filter_complex = f"{motion_chain}[v]"
+
+    # Encode to a temp name and publish atomically, so a run killed
+    # mid-encode never leaves a partial mp4 that the resume guard would
+    # trust. -f mp4 is explicit because the .tmp suffix hides the format.
+    tmp_path = output_video.with_name(output_video.name + '.tmp')
     cmd = [
-        'ffmpeg', '-y',
+        'ffmpeg', '-y', '-loglevel', 'error',
         '-loop', '1',
         '-i', str(image_path),
         '-filter_complex', filter_complex,
         '-map', '[v]',
-        '-c:v', 'libx264',
+        *VIDEO_ENCODER_ARGS,
+        *NORMALIZE_ARGS,
+        '-threads', str(ENCODE_THREADS),
         '-t', str(duration),
-        '-pix_fmt', 'yuv420p',
-        '-r', '25',
-        str(output_video)
+        '-f', 'mp4',
+        str(tmp_path)
     ]
 
     try:
-        subprocess.run(cmd, check=True, capture_output=True)
+        returncode, _, stderr = await run_ffmpeg(cmd)
+        if returncode != 0:
+            print(f"  Error: {stderr}")
+            return False
+        os.replace(tmp_path, output_video)
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"  Error: {e.stderr.decode()}")
-        return False
-
-
-def concatenate_videos(video_files: list, output_video: Path) -> bool:
-    """Concatenate multiple videos into one."""
-    concat_file = OUTPUT_DIR / "concat.txt"
-    with open(concat_file, 'w') as f:
-        for video in video_files:
-            f.write(f"file '{video}'\n")
-
-    cmd = [
-        'ffmpeg', '-y',
-        '-f', 'concat',
-        '-safe', '0',
-        '-i', str(concat_file),
-        '-c', 'copy',
-        str(output_video)
-    ]
-
+    finally:
+        if textfile:
+            textfile.unlink(missing_ok=True)
+        tmp_path.unlink(missing_ok=True)
+
+
+async def assemble_final_video(segments: list, output_video: Path):
+    """Concatenate scene segments and burn in pending overlays in one pass.
+
+    segments is a list of (video_path, text) pairs where text is None for
+    segments that already carry their overlay (Ken Burns renders). Veo
+    clips arrive raw, so applying their drawtext here folds the per-scene
+    overlay re-encode into the final assembly encode. Returns the output
+    duration in seconds (parsed from -progress, no follow-up ffprobe), or
+    None on failure.
+    """
+    inputs = []
+    chains = []
+    labels = []
+    textfiles = []
     try:
-        subprocess.run(cmd, check=True, capture_output=True)
-        concat_file.unlink()
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"  Error: {e.stderr.decode()}")
-        return False
+        for i, (video, text) in enumerate(segments):
+            inputs += ['-i', str(video)]
+            steps = []
+            # Only rescale segments that differ from the output geometry;
+            # Veo and Ken Burns both deliver 720x1280 already
+            width, height = await probe_dimensions(video)
+            if (width, height) != (720, 1280):
+                steps.append('scale=720:1280:flags=fast_bilinear,setsar=1')
+            if text:
+                drawtext_filter, textfile = build_drawtext_filter(text)
+                textfiles.append(textfile)
+                steps.append(drawtext_filter)
+            chain = ','.join(steps) if steps else 'null'
+            chains.append(f"[{i}:v]{chain}[v{i}]")
+            labels.append(f"[v{i}]")
 
+        filter_complex = (
+            ';'.join(chains) +
+            f";{''.join(labels)}concat=n={len(segments)}:v=1:a=0[out]"
+        )
+        # Same atomic publish as the scene encodes: temp name + rename
+        tmp_path = output_video.with_name(output_video.name + '.tmp')
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            *inputs,
+            '-filter_complex', filter_complex,
+            '-map', '[out]',
+            *VIDEO_ENCODER_ARGS,
+            *NORMALIZE_ARGS,
+            '-an',
+            '-progress', 'pipe:1',
+            '-f', 'mp4',
+            str(tmp_path)
+        ]
 
-def main():
-    print("=" * 60)
-    print("Video Generation: 'When You're Becoming Someone New'")
-    print("Style: Van Gogh-inspired painterly animation")
-    print("=" * 60)
+        try:
+            returncode, stdout, stderr = await run_ffmpeg(cmd, capture_stdout=True)
+            if returncode != 0:
+                print(f"  Error: {stderr}")
+                return None
+            os.replace(tmp_path, output_video)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        duration = 0.0
+        for line in stdout.splitlines():
+            if line.startswith('out_time_us='):
+                try:
+                    duration = int(line.split('=', 1)[1]) / 1e6
+                except ValueError:
+                    pass
+        return duration
+    finally:
+        for tf in textfiles:
+            tf.unlink(missing_ok=True)
+
+
+async def verify_video(video_path: Path) -> bool:
+    """Cheap integrity check that a cached video's streams parse cleanly."""
+    returncode, _, stderr = await run_ffmpeg(
+        ['ffprobe', '-v', 'error', str(video_path)]
+    )
+    return returncode == 0 and not stderr.strip()
 
-    api_key = find_api_key()
-    if not api_key:
-        print("\nError: GEMINI_API_KEY not found")
-        sys.exit(1)
 
-    client = genai.Client(api_key=api_key)
-    scene_videos = []
-    use_veo = True  # Try Veo first, fallback to Ken Burns
+async def generate_all_images(client) -> dict:
+    """Dispatch every missing scene image as one concurrent batch.
 
+    Imagen has no multi-prompt batch endpoint in the genai SDK, so the
+    closest equivalent is firing all requests together behind the token
+    bucket - they share one dispatch window (and one cache-friendly
+    prompt prefix). Returns {scene_id: task} for the in-flight images.
+    """
+    tasks = {}
     for scene in SCENES:
+        raw_image = OUTPUT_DIR / f"scene_{scene['id']}_raw.png"
+        final_video = OUTPUT_DIR / f"scene_{scene['id']}.mp4"
+        if final_video.exists() and final_video.stat().st_size > 0:
+            continue  # scene is fully rendered; process_scene will reuse it
+        if not raw_image.exists():
+            tasks[scene['id']] = asyncio.create_task(
+                generate_image(client, scene['prompt'], raw_image)
+            )
+    return tasks
+
+
+async def process_scene(client, scene: dict, image_tasks: dict,
+                        semaphore: asyncio.Semaphore,
+                        encode_semaphore: asyncio.Semaphore, veo_state: dict) -> tuple:
+    """Run the image -> video pipeline for a single scene.
+
+    Returns (video_path, pending_text) where pending_text is the overlay
+    text that final assembly still needs to burn in (None when the
+    segment already carries it), or None if the scene failed.
+    """
+    # Resume cheaply: a finished scene from a previous run needs no work
+    # at all, not even the overlay re-encode. Set VERIFY_CACHE=1 to also
+    # check the file decodes before trusting it.
+    final_video = OUTPUT_DIR / f"scene_{scene['id']}.mp4"
+    if final_video.exists() and final_video.stat().st_size > 0:
+        if os.getenv('VERIFY_CACHE') != '1' or await verify_video(final_video):
+            print(f"\nScene {scene['id']} already complete: {final_video.name}")
+            return final_video, None
+
+    async with semaphore:
         print(f"\n{'='*60}")
         print(f"Scene {scene['id']}: {scene['objective']}")
         print(f"Text: {scene['text'].replace(chr(10), ' | ')}")
@@ -411,77 +750,110 @@ def main():
         # Paths
         raw_image = OUTPUT_DIR / f"scene_{scene['id']}_raw.png"
         raw_video = OUTPUT_DIR / f"scene_{scene['id']}_raw.mp4"
-        final_video = OUTPUT_DIR / f"scene_{scene['id']}.mp4"
 
-        # Step 1: Generate image
-        if not raw_image.exists():
-            print("\n[1/3] Generating Van Gogh-style image...")
-            if not generate_image(client, scene['prompt'], raw_image):
+        # Step 1: Wait for this scene's image (dispatched as a batch in main)
+        if scene['id'] in image_tasks:
+            print("\n[1/2] Generating Van Gogh-style image...")
+            if not await image_tasks[scene['id']]:
                 print(f"  FAILED - Skipping scene {scene['id']}")
-                continue
+                return None
+        elif raw_image.exists():
+            print(f"\n[1/2] Image exists: {raw_image.name}")
         else:
-            print(f"\n[1/3] Image exists: {raw_image.name}")
+            # No batched task and no image on disk - reachable when the
+            # scene looked complete at dispatch time but its final video
+            # was rejected (e.g. by VERIFY_CACHE). Generate it now.
+            print("\n[1/2] Generating Van Gogh-style image...")
+            if not await generate_image(client, scene['prompt'], raw_image):
+                print(f"  FAILED - Skipping scene {scene['id']}")
+                return None
 
         # Step 2: Generate animated video from image
-        print("\n[2/3] Creating animated video...")
+        print("\n[2/2] Creating animated video...")
         video_created = False
 
-        if use_veo and not raw_video.exists():
+        if veo_state['use_veo'] and not raw_video.exists():
             # Animation prompt for Veo - emphasize painterly motion
             animation_prompt = f"""Gentle living painting animation like a Van Gogh artwork coming to life.
 {scene['camera']}. Subtle organic movement - brushstrokes seem to flow, colors breathe and shift naturally.
 Clouds drift with painted texture, light dances like in impressionist art. Maintain thick impasto oil painting look throughout.
 Movement should feel hand-animated, artistic, dreamlike. NOT realistic motion. 8 seconds of peaceful contemplation."""
 
-            video_created = generate_video_from_image(
-                client, raw_image, animation_prompt, raw_video
+            video_created = await generate_video_from_image(
+                client, raw_image, animation_prompt, raw_video, veo_state
             )
 
             if not video_created:
                 print("  Veo failed, using Ken Burns fallback...")
-                use_veo = False  # Disable for remaining scenes
+                # Clear the latch; concurrent scenes re-check it before
+                # each of their own remaining Veo attempts
+                veo_state['use_veo'] = False
 
         if not video_created and not raw_video.exists():
-            # Fallback: Ken Burns effect
+            # Fallback: Ken Burns effect with the text overlay fused into
+            # the same encode - no separate drawtext pass needed. The
+            # encode pool keeps concurrent libx264 jobs from oversubscribing
+            # the CPU when several scenes hit the fallback at once.
             print("  Using Ken Burns motion effect...")
-            video_created = create_fallback_video(
-                raw_image, raw_video, 6.0, scene['camera']
-            )
+            async with encode_semaphore:
+                created = await create_fallback_video(
+                    raw_image, final_video, 6.0, scene['camera'], text=scene['text']
+                )
+            if created:
+                print(f"  Scene {scene['id']} complete!")
+                return final_video, None
+            print(f"  FAILED - Skipping scene {scene['id']}")
+            return None
         elif raw_video.exists():
             print(f"  Video exists: {raw_video.name}")
             video_created = True
 
         if not video_created:
             print(f"  FAILED - Skipping scene {scene['id']}")
-            continue
+            return None
 
-        # Step 3: Add text overlay
-        print("\n[3/3] Adding text overlay...")
-        if add_text_overlay_to_video(raw_video, final_video, scene['text']):
-            scene_videos.append(final_video)
-            print(f"  Scene {scene['id']} complete!")
-        else:
-            print(f"  Text overlay failed, using raw video...")
-            scene_videos.append(raw_video)
+        # Veo clip: the text overlay is burned in during final assembly,
+        # so the raw clip goes straight to the concat with its text
+        print(f"  Scene {scene['id']} complete (overlay deferred to assembly)")
+        return raw_video, scene['text']
+
+
+async def main():
+    print("=" * 60)
+    print("Video Generation: 'When You're Becoming Someone New'")
+    print("Style: Van Gogh-inspired painterly animation")
+    print("=" * 60)
+
+    api_key = find_api_key()
+    if not api_key:
+        print("\nError: GEMINI_API_KEY not found")
+        sys.exit(1)
 
-    # Final: Concatenate all scenes
-    if scene_videos:
+    client = genai.Client(api_key=api_key)
+    veo_state = {'use_veo': True}  # Try Veo first, fallback to Ken Burns
+
+    # Dispatch all image generations together, then run scenes
+    # concurrently; API latency dominates, so they overlap well
+    image_tasks = await generate_all_images(client)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCENES)
+    encode_semaphore = asyncio.Semaphore(ENCODE_POOL_SIZE)
+    results = await asyncio.gather(*[
+        process_scene(client, scene, image_tasks, semaphore, encode_semaphore, veo_state)
+        for scene in SCENES
+    ])
+    segments = [result for result in results if result is not None]
+
+    # Final: Concatenate all scenes and burn in any deferred overlays
+    if segments:
         print(f"\n{'='*60}")
         print("FINAL ASSEMBLY")
         print(f"{'='*60}")
 
         final_output = OUTPUT_DIR / "final_video.mp4"
-        print(f"Concatenating {len(scene_videos)} scenes...")
-
-        if concatenate_videos(scene_videos, final_output):
-            # Get video info
-            result = subprocess.run(
-                ['ffprobe', '-v', 'quiet', '-show_entries',
-                 'format=duration', '-of', 'csv=p=0', str(final_output)],
-                capture_output=True, text=True
-            )
-            duration = float(result.stdout.strip()) if result.stdout.strip() else 0
+        print(f"Concatenating {len(segments)} scenes...")
 
+        duration = await assemble_final_video(segments, final_output)
+        if duration is not None:
             print(f"\n{'='*60}")
             print(f"SUCCESS!")
             print(f"Output: {final_output}")
@@ -494,4 +866,4 @@ Movement should feel hand-animated, artistic, dreamlike. NOT realistic motion. 8
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())